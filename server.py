@@ -1,13 +1,85 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import importlib.util
+import time
+from typing import Any, Dict, Optional, Tuple
 import httpx
+import orjson
 from mcp.server.fastmcp import FastMCP
 
-# Initialize FastMCP server
-mcp = FastMCP("senso")
-
 # Constants
 SENSO_API_BASE = "https://sdk.senso.ai/api/v1"
 API_KEY = "tgr_YOUR_API_KEY"  # Will be set during startup
+SUPPORTED_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE"})
+MAX_RESPONSE_BYTES = 32 * 1024 * 1024  # Reject response bodies larger than this
+MAX_ERROR_BYTES = 64 * 1024  # Error bodies only need to carry a message
+# HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+LIST_CACHE_TTL = 30.0  # Seconds a list_prompts/list_templates page stays cached
+LIST_CACHE_MAXSIZE = 128
+
+# Shared HTTP client, created on first use so it binds to the running event loop
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """Return the pooled Senso API client, creating it if needed."""
+    global _client
+    if _client is None or _client.is_closed:
+        # Auth headers ride on the client defaults so requests don't rebuild them
+        _client = httpx.AsyncClient(
+            base_url=SENSO_API_BASE,
+            http2=HTTP2_AVAILABLE,  # Multiplex concurrent tool calls over one connection
+            headers={
+                "X-API-Key": API_KEY,
+                "Accept": "application/json"
+            },
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+                keepalive_expiry=30
+            )
+        )
+    return _client
+
+async def close_client() -> None:
+    """Close the pooled Senso API client if it was opened."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+# Cached list pages keyed by (resource, limit, offset) -> (expires_at, response)
+_list_cache: Dict[Tuple[str, int, int], Tuple[float, Any]] = {}
+# List requests currently on the wire, shared by concurrent callers of the same page
+_inflight: Dict[Tuple[str, int, int], "asyncio.Task[Any]"] = {}
+
+def _cache_get(key: Tuple[str, int, int]) -> Any:
+    """Return a cached list response, or None if missing or expired."""
+    entry = _list_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        del _list_cache[key]
+        return None
+    return value
+
+def _cache_set(key: Tuple[str, int, int], value: Any) -> None:
+    """Store a list response, evicting the oldest entry when full."""
+    if key not in _list_cache and len(_list_cache) >= LIST_CACHE_MAXSIZE:
+        del _list_cache[next(iter(_list_cache))]
+    _list_cache[key] = (time.monotonic() + LIST_CACHE_TTL, value)
+
+def invalidate_list_cache(resource: str) -> None:
+    """Drop every cached page for a resource after it has been modified."""
+    for key in [key for key in _list_cache if key[0] == resource]:
+        del _list_cache[key]
+    # Requests already in flight may carry pre-write data, so don't let them populate the cache
+    for key in [key for key in _inflight if key[0] == resource]:
+        del _inflight[key]
+
+# Initialize FastMCP server
+mcp = FastMCP("senso")
 
 async def make_senso_request(
     method: str,
@@ -17,42 +89,85 @@ async def make_senso_request(
     files: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """Make a request to the Senso API with proper error handling."""
-    url = f"{SENSO_API_BASE}{endpoint}"
-    headers = {
-        "X-API-Key": API_KEY,
-        "Accept": "application/json"
-    }
+    method = method.upper()
+    
+    # Multipart uploads send params as form fields alongside the files
+    if files:
+        kwargs = {"data": params, "files": files}
+    else:
+        kwargs = {"params": params, "json": json_data}
     
-    async with httpx.AsyncClient() as client:
-        try:
-            if method.lower() == "get":
-                response = await client.get(url, headers=headers, params=params, timeout=30.0)
-            elif method.lower() == "post":
-                if files:
-                    response = await client.post(url, headers=headers, data=params, files=files, timeout=30.0)
-                else:
-                    response = await client.post(url, headers=headers, json=json_data, timeout=30.0)
-            elif method.lower() == "put":
-                response = await client.put(url, headers=headers, json=json_data, timeout=30.0)
-            elif method.lower() == "patch":
-                response = await client.patch(url, headers=headers, json=json_data, timeout=30.0)
-            elif method.lower() == "delete":
-                response = await client.delete(url, headers=headers, timeout=30.0)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            try:
-                error_detail = e.response.json()
-                error_message = error_detail.get("error", str(e))
-            except Exception:
-                error_message = str(e)
-            
-            raise Exception(f"API Error: {error_message}")
-        except Exception as e:
-            raise Exception(f"Request failed: {str(e)}")
+    try:
+        if method not in SUPPORTED_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
+        client = get_client()
+        async with client.stream(method, endpoint, **kwargs) as response:
+            if not response.is_success:
+                try:
+                    error_body = await read_body(response, MAX_ERROR_BYTES)
+                except ValueError:
+                    error_body = b""  # Too large to hold a useful message; report the status instead
+                try:
+                    response.raise_for_status()
+                except httpx.HTTPStatusError as e:
+                    raise RuntimeError(f"API Error: {_format_http_error(e, error_body)}") from e
+            body = await read_body(response)
+        # 204s and other empty bodies have nothing to decode
+        return orjson.loads(body) if body else {}
+    except (httpx.HTTPError, ValueError) as e:
+        raise RuntimeError(f"Request failed: {e}") from e
+
+def _format_http_error(e: httpx.HTTPStatusError, body: bytes) -> str:
+    """Extract the API's error message from a failed response body, falling back to the status text."""
+    try:
+        return orjson.loads(body).get("error", str(e))
+    except (ValueError, AttributeError):
+        return str(e)
+
+async def read_body(response: httpx.Response, limit: int = MAX_RESPONSE_BYTES) -> bytearray:
+    """Read a streamed response body, refusing anything over limit bytes."""
+    content_length = response.headers.get("Content-Length")
+    if content_length and int(content_length) > limit:
+        raise ValueError(f"Response of {content_length} bytes exceeds the {limit} byte limit")
+    
+    # Chunked responses carry no length, so enforce the cap while reading too
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body += chunk
+        if len(body) > limit:
+            raise ValueError(f"Response exceeds the {limit} byte limit")
+    return body
+
+async def fetch_list(resource: str, params: Dict[str, Any]) -> Any:
+    """GET a paginated list endpoint, serving repeated pages from the TTL cache."""
+    key = (resource, params["limit"], params["offset"])
+    response = _cache_get(key)
+    if response is not None:
+        return response
+    
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(make_senso_request("get", f"/{resource}", params=params))
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _finish_inflight(key, done))
+    # Shield so one caller being cancelled doesn't abort the request for the others
+    return await asyncio.shield(task)
+
+def _finish_inflight(key: Tuple[str, int, int], task: "asyncio.Task[Any]") -> None:
+    """Cache a completed list request unless it was invalidated mid-flight."""
+    failed = task.cancelled() or task.exception() is not None
+    if _inflight.get(key) is task:
+        del _inflight[key]
+        if not failed:
+            _cache_set(key, task.result())
+
+def truncate_text(text: str, width: int = 100) -> str:
+    """Shorten text to width characters, marking cut text with an ellipsis."""
+    # Probe one character past the cut instead of measuring the whole string
+    if text[width:width + 1]:
+        return text[:width] + "..."
+    return text
 
 @mcp.tool()
 async def add_raw_content(
@@ -115,14 +230,14 @@ async def search_content(
             return f"No relevant information found for query: '{query}'."
         
         # Format results for display
-        output = f"Answer: {answer}\n\nFound {len(results)} relevant results for '{query}':\n\n"
+        parts = [f"Answer: {answer}\n\nFound {len(results)} relevant results for '{query}':\n\n"]
         for i, result in enumerate(results, 1):
-            output += f"Result {i}:\n"
-            output += f"Title: {result.get('title', 'No title')}\n"
-            output += f"Content: {result.get('chunk_text', 'No content')}\n"
-            output += f"ID: {result.get('content_id', 'No ID')}\n\n"
+            title = result.get("title", "No title")
+            chunk_text = result.get("chunk_text", "No content")
+            content_id = result.get("content_id", "No ID")
+            parts.append(f"Result {i}:\nTitle: {title}\nContent: {chunk_text}\nID: {content_id}\n\n")
         
-        return output
+        return "".join(parts)
     except Exception as e:
         return f"Search failed: {str(e)}"
 
@@ -159,17 +274,17 @@ async def generate_content(
         sources = response.get("sources", [])
         
         # Format the response
-        output = f"Generated content about {content_type}:\n\n{generated_text}\n\n"
+        parts = [f"Generated content about {content_type}:\n\n{generated_text}\n\n"]
         
         if content_id and save:
-            output += f"Content was saved with ID: {content_id}\n\n"
+            parts.append(f"Content was saved with ID: {content_id}\n\n")
         
         if sources:
-            output += "Sources used for generation:\n"
+            parts.append("Sources used for generation:\n")
             for i, source in enumerate(sources, 1):
-                output += f"Source {i}: {source.get('title', 'No title')}\n"
+                parts.append(f"Source {i}: {source.get('title', 'No title')}\n")
         
-        return output
+        return "".join(parts)
     except Exception as e:
         return f"Content generation failed: {str(e)}"
 
@@ -194,6 +309,7 @@ async def create_prompt(
     
     try:
         response = await make_senso_request("post", "/prompts", json_data=request_data)
+        invalidate_list_cache("prompts")
         return f"Prompt created successfully!\nID: {response.get('prompt_id')}\nName: {response.get('name')}"
     except Exception as e:
         return f"Failed to create prompt: {str(e)}"
@@ -215,19 +331,21 @@ async def list_prompts(
     }
     
     try:
-        response = await make_senso_request("get", "/prompts", params=params)
+        response = await fetch_list("prompts", params)
         
         if not response:
             return "No prompts found."
         
-        output = f"Prompts (showing {len(response)} results):\n\n"
+        parts = [f"Prompts (showing {len(response)} results):\n\n"]
         for prompt in response:
-            output += f"ID: {prompt.get('prompt_id')}\n"
-            output += f"Name: {prompt.get('name')}\n"
-            output += f"Text: {prompt.get('text', '')[:100]}{'...' if len(prompt.get('text', '')) > 100 else ''}\n"
-            output += f"Created: {prompt.get('created_at', 'Unknown')}\n\n"
+            parts.append(
+                f"ID: {prompt.get('prompt_id')}\n"
+                f"Name: {prompt.get('name')}\n"
+                f"Text: {truncate_text(prompt.get('text', ''))}\n"
+                f"Created: {prompt.get('created_at', 'Unknown')}\n\n"
+            )
         
-        return output
+        return "".join(parts)
     except Exception as e:
         return f"Failed to list prompts: {str(e)}"
 
@@ -254,6 +372,7 @@ async def update_prompt(
     
     try:
         response = await make_senso_request("put", f"/prompts/{prompt_id}", json_data=request_data)
+        invalidate_list_cache("prompts")
         return f"Prompt updated successfully!\nID: {response.get('prompt_id')}\nName: {response.get('name')}"
     except Exception as e:
         return f"Failed to update prompt: {str(e)}"
@@ -285,6 +404,7 @@ async def create_template(
     
     try:
         response = await make_senso_request("post", "/templates", json_data=request_data)
+        invalidate_list_cache("templates")
         return f"Template created successfully!\nID: {response.get('template_id')}\nName: {response.get('name')}\nOutput Type: {response.get('output_type')}"
     except Exception as e:
         return f"Failed to create template: {str(e)}"
@@ -306,20 +426,22 @@ async def list_templates(
     }
     
     try:
-        response = await make_senso_request("get", "/templates", params=params)
+        response = await fetch_list("templates", params)
         
         if not response:
             return "No templates found."
         
-        output = f"Templates (showing {len(response)} results):\n\n"
+        parts = [f"Templates (showing {len(response)} results):\n\n"]
         for template in response:
-            output += f"ID: {template.get('template_id')}\n"
-            output += f"Name: {template.get('name')}\n"
-            output += f"Output Type: {template.get('output_type')}\n"
-            output += f"Text: {template.get('text', '')[:100]}{'...' if len(template.get('text', '')) > 100 else ''}\n"
-            output += f"Created: {template.get('created_at', 'Unknown')}\n\n"
+            parts.append(
+                f"ID: {template.get('template_id')}\n"
+                f"Name: {template.get('name')}\n"
+                f"Output Type: {template.get('output_type')}\n"
+                f"Text: {truncate_text(template.get('text', ''))}\n"
+                f"Created: {template.get('created_at', 'Unknown')}\n\n"
+            )
         
-        return output
+        return "".join(parts)
     except Exception as e:
         return f"Failed to list templates: {str(e)}"
 
@@ -352,6 +474,7 @@ async def update_template(
     
     try:
         response = await make_senso_request("put", f"/templates/{template_id}", json_data=request_data)
+        invalidate_list_cache("templates")
         return f"Template updated successfully!\nID: {response.get('template_id')}\nName: {response.get('name')}"
     except Exception as e:
         return f"Failed to update template: {str(e)}"
@@ -396,27 +519,39 @@ async def generate_with_prompt(
         sources = response.get("sources", [])
         
         # Format the response
-        output = f"Generated content using prompt '{prompt_info.get('name', 'Unknown')}':\n\n"
-        output += f"{generated_text}\n\n"
+        parts = [f"Generated content using prompt '{prompt_info.get('name', 'Unknown')}':\n\n{generated_text}\n\n"]
         
         if template_info:
-            output += f"Formatted with template: {template_info.get('name')} ({template_info.get('output_type')})\n\n"
+            parts.append(f"Formatted with template: {template_info.get('name')} ({template_info.get('output_type')})\n\n")
         
         if content_id and save:
-            output += f"Content was saved with ID: {content_id}\n\n"
+            parts.append(f"Content was saved with ID: {content_id}\n\n")
         
         if sources:
-            output += f"Sources used ({len(sources)} total):\n"
-            for i, source in enumerate(sources[:5], 1):  # Show first 5 sources
-                output += f"- {source.get('title', 'No title')}\n"
+            parts.append(f"Sources used ({len(sources)} total):\n")
+            for source in sources[:5]:  # Show first 5 sources
+                parts.append(f"- {source.get('title', 'No title')}\n")
             if len(sources) > 5:
-                output += f"... and {len(sources) - 5} more sources\n"
+                parts.append(f"... and {len(sources) - 5} more sources\n")
         
-        return output
+        return "".join(parts)
     except Exception as e:
         return f"Content generation with prompt failed: {str(e)}"
 
+async def main() -> None:
+    """Run the stdio server, closing the shared client once the process is done serving."""
+    # Cleanup lives here rather than in a FastMCP lifespan, which runs per session
+    try:
+        await mcp.run_stdio_async()
+    finally:
+        await close_client()
+
 if __name__ == "__main__":
     # Initialize and run the server
     print("starting server...")
-    mcp.run(transport='stdio')
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())  # uvloop is unavailable on Windows; use the default loop
+    else:
+        asyncio.run(main(), loop_factory=uvloop.new_event_loop)